@@ -0,0 +1,15 @@
+"""
+Gunicorn configuration for running the API with uvicorn workers in production.
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Access logging costs throughput; errors still go to stderr
+accesslog = None
+errorlog = "-"
+loglevel = "warning"
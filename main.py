@@ -1,20 +1,45 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import atexit
 import logging
+import queue
+import orjson
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
+from pydantic import TypeAdapter, ValidationError
 from services.health_data.service import HealthDataService
 from services.health_data.models import (
     MetricType, SleepData, HeartRateData, WeightData,
     HealthDataResponse, HealthDataError
 )
 from services.llm_service import LLMService
+from services.cache_service import CacheService
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; records are handed to a background listener thread so
+# stream writes never block the event loop
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Health Data API")
+app = FastAPI(title="Health Data API", default_response_class=ORJSONResponse)
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
+    """Render HTTP errors with orjson, matching the success responses"""
+    return ORJSONResponse(
+        {"detail": exc.detail},
+        status_code=exc.status_code,
+        headers=getattr(exc, "headers", None)
+    )
 
 # Configure CORS
 app.add_middleware(
@@ -25,301 +50,545 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses for mobile clients; small payloads aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Initialize services
 health_data_service = HealthDataService()
 llm_service = LLMService()
+cache_service = CacheService()
+
+# Cache lifetimes in seconds; insights are kept longer since they cost an LLM call
+METRICS_CACHE_TTL = 60
+INSIGHTS_CACHE_TTL = 600
+# Insights for days that have fully ended only change on a backdated submit,
+# which invalidates them, so they can live much longer
+DAILY_INSIGHTS_CACHE_TTL = 86400
+
+# Upper bound in seconds on the per-metric fan-out behind recent insights
+RECENT_FETCH_TIMEOUT = 2.0
+
+# Request body adapters, built once and reused to validate raw JSON bytes
+_SLEEP_ADAPTER = TypeAdapter(SleepData)
+_HEART_RATE_ADAPTER = TypeAdapter(HeartRateData)
+_WEIGHT_ADAPTER = TypeAdapter(WeightData)
+_HEART_RATE_BATCH_ADAPTER = TypeAdapter(List[HeartRateData])
+
+def _json_body(adapter: TypeAdapter) -> Dict[str, Any]:
+    """openapi_extra documenting the raw JSON body a route validates with adapter.
+
+    The routes read the body themselves, so FastAPI never registers these
+    models as components; nested $defs are inlined instead of referenced.
+    """
+    schema = adapter.json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node: Any) -> Any:
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        return node
+
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": inline(schema)}},
+            "required": True
+        }
+    }
+
+def _validation_detail(e: ValidationError) -> List[Dict[str, Any]]:
+    """Validation errors as a 422 detail, without echoing the raw input.
+
+    For malformed JSON the input is the request body as bytes, which the
+    response can't serialize.
+    """
+    return e.errors(include_url=False, include_context=False, include_input=False)
+
+# Enum members and values bound once for the per-record projection helpers
+_METRIC_TYPES = tuple(MetricType)
+_SLEEP = MetricType.SLEEP.value
+_HEART_RATE = MetricType.HEART_RATE.value
+_WEIGHT = MetricType.WEIGHT.value
+
+def _build_sleep_metric(sleep: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a stored sleep record into the insight metric format"""
+    phases = sleep["phases"]
+    deep = phases.get("deep", 0)
+    rem = phases.get("rem", 0)
+    return {
+        "metric_type": _SLEEP,
+        "totalSleepTime": deep + phases.get("light", 0) + rem,
+        "sleepQuality": sleep.get("quality", 0),
+        "deepSleepTime": deep,
+        "remSleepTime": rem
+    }
+
+def _build_heart_rate_metric(hr: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a stored heart rate record into the insight metric format"""
+    return {
+        "metric_type": _HEART_RATE,
+        "heartRate": hr.get("value", 0),
+        "restingHeartRate": hr.get("resting_rate", 0),
+        "activityType": hr.get("activity_type", "unknown")
+    }
+
+def _build_heart_rate_rollup(rollup: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a per-day heart rate rollup into the insight metric format"""
+    return {
+        "metric_type": _HEART_RATE,
+        "date": rollup["date"],
+        "heartRate": rollup["avg_rate"],
+        "minHeartRate": rollup["min_rate"],
+        "maxHeartRate": rollup["max_rate"],
+        "restingHeartRate": rollup["resting_rate"] or 0,
+        "samples": rollup["samples"]
+    }
+
+def _build_weight_metric(weight: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a stored weight record into the insight metric format"""
+    body_comp = weight.get("body_composition") or {}
+    return {
+        "metric_type": _WEIGHT,
+        "weight": weight.get("value", 0),
+        "bmi": weight.get("bmi", 0),
+        "bodyFat": body_comp.get("body_fat", 0),
+        "muscleMass": body_comp.get("muscle_mass", 0),
+        "waterPercentage": body_comp.get("water_percentage", 0)
+    }
+
+# Static response, serialized once at import; async so it skips the threadpool
+_HELLO_RESPONSE = ORJSONResponse({"message": "Hello World"})
+
+# Placeholder insights returned when there is nothing to analyze
+_EMPTY_RECENT_RESPONSE = ORJSONResponse({
+    "status": "success",
+    "insights": {
+        "summary": "No health data available for the selected period. Start tracking your health metrics to get personalized insights.",
+        "status": "fair",
+        "highlights": [
+            "Ready to start tracking your health",
+            "Connect your device to begin monitoring"
+        ],
+        "recommendations": [
+            "Set up your health tracking device",
+            "Start recording your daily health metrics"
+        ],
+        "next_steps": "Begin tracking your health metrics today"
+    }
+})
+
+@lru_cache(maxsize=256)
+def _empty_daily_insights(day: str) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "insights": {
+            "summary": f"No health data available for {day}. Start tracking your health metrics to get personalized insights.",
+            "status": "fair",
+            "highlights": [
+                "Ready to start tracking your health",
+                "Connect your device to begin monitoring"
+            ],
+            "recommendations": [
+                "Set up your health tracking device",
+                "Start recording your daily health metrics"
+            ],
+            "next_steps": "Begin tracking your health metrics today"
+        }
+    }
+
+@lru_cache(maxsize=256)
+def _invalid_daily_insights(day: str) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "insights": {
+            "summary": f"No valid health data available for {day}. Please ensure your health tracking device is properly connected.",
+            "status": "fair",
+            "highlights": [
+                "Device connection needed",
+                "Health tracking ready to start"
+            ],
+            "recommendations": [
+                "Check your device connection",
+                "Verify your health tracking settings"
+            ],
+            "next_steps": "Connect your health tracking device"
+        }
+    }
 
 @app.get("/")
-def hello_world():
-    return {"message": "Hello World"}
+async def hello_world():
+    return _HELLO_RESPONSE
 
-@app.post("/api/v1/health-data/sleep")
+@app.post("/api/v1/health-data/sleep", openapi_extra=_json_body(_SLEEP_ADAPTER))
 async def submit_sleep_data(
-    data: SleepData
+    request: Request
 ) -> HealthDataResponse:
     """Submit sleep data"""
     try:
-        return await health_data_service.store_sleep_data(data)
+        data = _SLEEP_ADAPTER.validate_json(await request.body())
+        response = await health_data_service.store_sleep_data(data)
+        await cache_service.invalidate("metrics", "daily")
+        await _invalidate_daily_insights(data.start_time)
+        return response
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=_validation_detail(e))
     except HealthDataError as e:
         raise HTTPException(status_code=400, detail=e.dict())
     except Exception as e:
-        logger.error(f"Error submitting sleep data: {str(e)}")
+        logger.error("Error submitting sleep data: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/v1/health-data/heart-rate")
+@app.post("/api/v1/health-data/heart-rate", openapi_extra=_json_body(_HEART_RATE_ADAPTER))
 async def submit_heart_rate_data(
-    data: HeartRateData
+    request: Request
 ) -> HealthDataResponse:
     """Submit heart rate data"""
     try:
-        return await health_data_service.store_heart_rate_data(data)
+        data = _HEART_RATE_ADAPTER.validate_json(await request.body())
+        response = await health_data_service.store_heart_rate_data(data)
+        await cache_service.invalidate("metrics", "daily")
+        await _invalidate_daily_insights(data.timestamp)
+        return response
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=_validation_detail(e))
     except HealthDataError as e:
         raise HTTPException(status_code=400, detail=e.dict())
     except Exception as e:
-        logger.error(f"Error submitting heart rate data: {str(e)}")
+        logger.error("Error submitting heart rate data: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/v1/health-data/weight")
+@app.post("/api/v1/health-data/heart-rate/batch", openapi_extra=_json_body(_HEART_RATE_BATCH_ADAPTER))
+async def submit_heart_rate_batch(
+    request: Request
+) -> HealthDataResponse:
+    """Submit many heart rate readings in one request"""
+    try:
+        data = _HEART_RATE_BATCH_ADAPTER.validate_json(await request.body())
+        if not data:
+            return HealthDataResponse(status="success", message="No heart rate readings to store")
+        response = await health_data_service.store_heart_rate_bulk(data)
+        await cache_service.invalidate("metrics", "daily")
+        await _invalidate_daily_insights(*(reading.timestamp for reading in data))
+        return response
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=_validation_detail(e))
+    except HealthDataError as e:
+        raise HTTPException(status_code=400, detail=e.dict())
+    except Exception as e:
+        logger.error("Error submitting heart rate batch: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/health-data/weight", openapi_extra=_json_body(_WEIGHT_ADAPTER))
 async def submit_weight_data(
-    data: WeightData
+    request: Request
 ) -> HealthDataResponse:
     """Submit weight data"""
     try:
-        return await health_data_service.store_weight_data(data)
+        data = _WEIGHT_ADAPTER.validate_json(await request.body())
+        response = await health_data_service.store_weight_data(data)
+        await cache_service.invalidate("metrics", "daily")
+        await _invalidate_daily_insights(data.timestamp)
+        return response
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=_validation_detail(e))
     except HealthDataError as e:
         raise HTTPException(status_code=400, detail=e.dict())
     except Exception as e:
-        logger.error(f"Error submitting weight data: {str(e)}")
+        logger.error("Error submitting weight data: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/health-data/{metric_type}")
 async def get_health_data(
     metric_type: MetricType,
     days: int = Query(7, ge=1, le=30)
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """Get health data for a specific metric type"""
     try:
+        cache_key = f"metrics:{metric_type.value}:{days}"
+        cached, cache_slot = await cache_service.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+
         data = await health_data_service.get_recent_data(metric_type, days)
-        return {
+        result = {
             "status": "success",
             "data": data
         }
+        await cache_service.set(cache_slot, result, METRICS_CACHE_TTL)
+        return ORJSONResponse(result)
     except HealthDataError as e:
         raise HTTPException(status_code=400, detail=e.dict())
     except Exception as e:
-        logger.error(f"Error retrieving health data: {str(e)}")
+        logger.error("Error retrieving health data: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/health-data/{metric_type}/stream")
+async def stream_health_data(
+    metric_type: MetricType,
+    days: int = Query(7, ge=1, le=30)
+) -> StreamingResponse:
+    """Stream health data for a specific metric type as a JSON array"""
+    def body():
+        # A sync iterator, so Starlette runs each blocking fetch in its threadpool
+        yield b"["
+        separator = b""
+        for chunk in health_data_service.iter_recent_data(metric_type, days):
+            yield separator + orjson.dumps(chunk)[1:-1]
+            separator = b","
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
 @app.get("/api/v1/health-data/daily/{date}")
 async def get_daily_summary(
     date: datetime
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """Get daily health summary"""
     try:
         # Ensure date is UTC-aware
         if date.tzinfo is None:
             date = date.replace(tzinfo=timezone.utc)
+        cache_key = f"daily:{date.isoformat()}"
+        cached, cache_slot = await cache_service.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+
         summary = await health_data_service.get_daily_summary(date)
-        return {
+        result = {
             "status": "success",
             "data": summary
         }
+        await cache_service.set(cache_slot, result, METRICS_CACHE_TTL)
+        return ORJSONResponse(result)
     except HealthDataError as e:
         raise HTTPException(status_code=400, detail=e.dict())
     except Exception as e:
-        logger.error(f"Error retrieving daily summary: {str(e)}")
+        logger.error("Error retrieving daily summary: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/health-data/daily/{date}/aggregates")
+async def get_daily_aggregates(
+    date: datetime
+) -> ORJSONResponse:
+    """Get daily health totals and averages computed in the database"""
+    try:
+        # Ensure date is UTC-aware
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        cache_key = f"daily:aggregates:{date.isoformat()}"
+        cached, cache_slot = await cache_service.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+
+        aggregates = await health_data_service.get_daily_aggregates(date)
+        result = {
+            "status": "success",
+            "data": aggregates
+        }
+        await cache_service.set(cache_slot, result, METRICS_CACHE_TTL)
+        return ORJSONResponse(result)
+    except HealthDataError as e:
+        raise HTTPException(status_code=400, detail=e.dict())
+    except Exception as e:
+        logger.error("Error retrieving daily aggregates: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _fetch_recent_data(metric_type: MetricType, days: int) -> Any:
+    """Fetch recent data, returning the exception instead of raising it so a
+    failing metric type doesn't cancel its siblings in the task group"""
+    try:
+        if metric_type == MetricType.HEART_RATE:
+            # Only per-day rollups reach the LLM, so aggregate in SQL
+            return await health_data_service.get_heart_rate_rollups(days)
+        return await health_data_service.get_recent_data(metric_type, days)
+    except Exception as e:
+        return e
+
+async def _collect_recent_metrics(days: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch recent data for every metric type and project it for the LLM.
+
+    Also returns whether every fetch completed; metrics from a timed out or
+    failed fetch are left out.
+    """
+    # Get data for all metric types concurrently, bounded so one slow
+    # metric type can't hold up insights for the others
+    tasks: Dict[MetricType, asyncio.Task] = {}
+    try:
+        async with asyncio.timeout(RECENT_FETCH_TIMEOUT), asyncio.TaskGroup() as tg:
+            for mt in _METRIC_TYPES:
+                tasks[mt] = tg.create_task(_fetch_recent_data(mt, days))
+    except TimeoutError:
+        logger.warning("Timed out fetching recent data after %ss, using partial data", RECENT_FETCH_TIMEOUT)
+
+    metrics = []
+    complete = True
+    for metric_type, task in tasks.items():
+        try:
+            if task.cancelled():
+                raise TimeoutError("fetch timed out")
+            data = task.result()
+            if isinstance(data, Exception):
+                raise data
+            if not data:
+                logger.info("No %s data available for the last %s days", metric_type.value, days)
+                continue
+
+            if metric_type == MetricType.SLEEP:
+                metrics.extend(
+                    _build_sleep_metric(sleep) for sleep in data
+                    if isinstance(sleep.get("phases"), dict)
+                )
+
+            elif metric_type == MetricType.HEART_RATE:
+                metrics.extend(map(_build_heart_rate_rollup, data))
+
+            elif metric_type == MetricType.WEIGHT:
+                metrics.extend(map(_build_weight_metric, data))
+
+        except Exception as e:
+            logger.error("Error collecting %s data: %s", metric_type.value, e)
+            complete = False
+            continue
+
+    return metrics, complete
+
 @app.get("/api/v1/insights/recent")
 async def get_recent_insights(
     days: int = Query(7, ge=1, le=30)
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """Get AI-powered health insights for recent data"""
     try:
-        # Get data for all metric types
-        metrics = []
-        for metric_type in MetricType:
-            try:
-                data = await health_data_service.get_recent_data(metric_type, days)
-                if not data:
-                    logger.info(f"No {metric_type.value} data available for the last {days} days")
-                    continue
-
-                if metric_type == MetricType.SLEEP:
-                    for sleep in data:
-                        try:
-                            if not isinstance(sleep.get("phases"), dict):
-                                logger.warning(f"Invalid sleep phases data: {sleep}")
-                                continue
-                            
-                            phases = sleep["phases"]
-                            total_sleep = phases.get("deep", 0) + phases.get("light", 0) + phases.get("rem", 0)
-                            metrics.append({
-                                "metric_type": metric_type.value,
-                                "totalSleepTime": total_sleep,
-                                "sleepQuality": sleep.get("quality", 0),
-                                "deepSleepTime": phases.get("deep", 0),
-                                "remSleepTime": phases.get("rem", 0)
-                            })
-                        except Exception as e:
-                            logger.error(f"Error processing sleep data: {str(e)}")
-                            continue
-
-                elif metric_type == MetricType.HEART_RATE:
-                    for hr in data:
-                        try:
-                            metrics.append({
-                                "metric_type": metric_type.value,
-                                "heartRate": hr.get("value", 0),
-                                "restingHeartRate": hr.get("resting_rate", 0),
-                                "activityType": hr.get("activity_type", "unknown")
-                            })
-                        except Exception as e:
-                            logger.error(f"Error processing heart rate data: {str(e)}")
-                            continue
-
-                elif metric_type == MetricType.WEIGHT:
-                    for weight in data:
-                        try:
-                            body_comp = weight.get("body_composition", {}) or {}
-                            metrics.append({
-                                "metric_type": metric_type.value,
-                                "weight": weight.get("value", 0),
-                                "bmi": weight.get("bmi", 0),
-                                "bodyFat": body_comp.get("body_fat", 0),
-                                "muscleMass": body_comp.get("muscle_mass", 0),
-                                "waterPercentage": body_comp.get("water_percentage", 0)
-                            })
-                        except Exception as e:
-                            logger.error(f"Error processing weight data: {str(e)}")
-                            continue
-
-            except Exception as e:
-                logger.error(f"Error retrieving {metric_type.value} data: {str(e)}")
-                continue
+        cache_key = f"insights:recent:{days}"
+        cached, cache_slot = await cache_service.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+
+        metrics, complete = await _collect_recent_metrics(days)
 
         if not metrics:
             logger.info("No health data available for insights")
-            return {
-                "status": "success",
-                "insights": {
-                    "summary": "No health data available for the selected period. Start tracking your health metrics to get personalized insights.",
-                    "status": "fair",
-                    "highlights": [
-                        "Ready to start tracking your health",
-                        "Connect your device to begin monitoring"
-                    ],
-                    "recommendations": [
-                        "Set up your health tracking device",
-                        "Start recording your daily health metrics"
-                    ],
-                    "next_steps": "Begin tracking your health metrics today"
-                }
-            }
+            return _EMPTY_RECENT_RESPONSE
 
         # Generate insights using LLM
         insights = await llm_service.get_health_insights(metrics)
-        return {
+        result = {
             "status": "success",
             "insights": insights
         }
+        # Insights from partial data or an unusable LLM response aren't cached
+        if complete and not insights.get("fallback"):
+            await cache_service.set(cache_slot, result, INSIGHTS_CACHE_TTL)
+        return ORJSONResponse(result)
+    except Exception as e:
+        logger.error("Error generating insights: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate insights: {str(e)}"
+        )
+
+@app.get("/api/v1/insights/recent/stream")
+async def stream_recent_insights(
+    days: int = Query(7, ge=1, le=30)
+) -> StreamingResponse:
+    """Stream AI-powered health insights for recent data as server-sent events"""
+    try:
+        metrics, _ = await _collect_recent_metrics(days)
     except Exception as e:
-        logger.error(f"Error generating insights: {str(e)}")
+        logger.error("Error collecting metrics for streamed insights: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate insights: {str(e)}"
         )
 
+    async def event_stream():
+        try:
+            async for chunk in llm_service.stream_health_insights(metrics):
+                yield "".join(f"data: {line}\n" for line in chunk.split("\n")) + "\n"
+        except Exception as e:
+            logger.error("Error streaming insights: %s", e)
+            yield "event: error\ndata: Failed to generate insights\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+async def _daily_insights(date: datetime) -> Tuple[Dict[str, Any], bool]:
+    """Build the insights payload for the day starting at date.
+
+    Also returns whether the payload may be cached. Placeholders for a day
+    without usable data are not, since the data may still be imported.
+    """
+    # Get daily summary
+    summary = await health_data_service.get_daily_summary(date)
+    if not summary:
+        logger.info("No health data available for %s", date.isoformat())
+        return _empty_daily_insights(str(date.date())), False
+    
+    # Convert summary to metrics format, one pass per section
+    metrics = []
+    try:
+        metrics.extend(
+            _build_sleep_metric(sleep) for sleep in summary.get("sleep", [])
+            if isinstance(sleep.get("phases"), dict)
+        )
+        metrics.extend(map(_build_heart_rate_metric, summary.get("heart_rate", [])))
+        metrics.extend(map(_build_weight_metric, summary.get("weight", [])))
+    except Exception as e:
+        logger.error("Error processing daily health data: %s", e)
+    
+    if not metrics:
+        logger.info("No valid health data available for %s", date.isoformat())
+        return _invalid_daily_insights(str(date.date())), False
+    
+    # Generate insights
+    insights = await llm_service.get_health_insights(metrics)
+    result = {
+        "status": "success",
+        "insights": insights
+    }
+    # Placeholder insights from an unusable LLM response aren't cached either
+    return result, not insights.get("fallback", False)
+
+def _start_of_today() -> datetime:
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+async def _invalidate_daily_insights(*timestamps: datetime) -> None:
+    """Drop cached insights when a record lands in a day that has already ended"""
+    start_of_today = _start_of_today()
+    for timestamp in timestamps:
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        if timestamp < start_of_today:
+            await cache_service.invalidate("insights")
+            return
+
 @app.get("/api/v1/insights/daily/{date}")
 async def get_daily_insights(
     date: datetime
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """Get AI-powered health insights for a specific day"""
     try:
         # Ensure date is UTC-aware
         if date.tzinfo is None:
             date = date.replace(tzinfo=timezone.utc)
-        
-        # Get daily summary
-        summary = await health_data_service.get_daily_summary(date)
-        if not summary:
-            logger.info(f"No health data available for {date.isoformat()}")
-            return {
-                "status": "success",
-                "insights": {
-                    "summary": f"No health data available for {date.date()}. Start tracking your health metrics to get personalized insights.",
-                    "status": "fair",
-                    "highlights": [
-                        "Ready to start tracking your health",
-                        "Connect your device to begin monitoring"
-                    ],
-                    "recommendations": [
-                        "Set up your health tracking device",
-                        "Start recording your daily health metrics"
-                    ],
-                    "next_steps": "Begin tracking your health metrics today"
-                }
-            }
-        
-        # Convert summary to metrics format
-        metrics = []
-        
-        # Process sleep data
-        for sleep in summary.get("sleep", []):
-            try:
-                if not isinstance(sleep.get("phases"), dict):
-                    logger.warning(f"Invalid sleep phases data: {sleep}")
-                    continue
-                
-                phases = sleep["phases"]
-                total_sleep = phases.get("deep", 0) + phases.get("light", 0) + phases.get("rem", 0)
-                metrics.append({
-                    "metric_type": MetricType.SLEEP.value,
-                    "totalSleepTime": total_sleep,
-                    "sleepQuality": sleep.get("quality", 0),
-                    "deepSleepTime": phases.get("deep", 0),
-                    "remSleepTime": phases.get("rem", 0)
-                })
-            except Exception as e:
-                logger.error(f"Error processing sleep data: {str(e)}")
-                continue
-        
-        # Process heart rate data
-        for hr in summary.get("heart_rate", []):
-            try:
-                metrics.append({
-                    "metric_type": MetricType.HEART_RATE.value,
-                    "heartRate": hr.get("value", 0),
-                    "restingHeartRate": hr.get("resting_rate", 0),
-                    "activityType": hr.get("activity_type", "unknown")
-                })
-            except Exception as e:
-                logger.error(f"Error processing heart rate data: {str(e)}")
-                continue
-        
-        # Process weight data
-        for weight in summary.get("weight", []):
-            try:
-                body_comp = weight.get("body_composition", {}) or {}
-                metrics.append({
-                    "metric_type": MetricType.WEIGHT.value,
-                    "weight": weight.get("value", 0),
-                    "bmi": weight.get("bmi", 0),
-                    "bodyFat": body_comp.get("body_fat", 0),
-                    "muscleMass": body_comp.get("muscle_mass", 0),
-                    "waterPercentage": body_comp.get("water_percentage", 0)
-                })
-            except Exception as e:
-                logger.error(f"Error processing weight data: {str(e)}")
-                continue
-        
-        if not metrics:
-            logger.info(f"No valid health data available for {date.isoformat()}")
-            return {
-                "status": "success",
-                "insights": {
-                    "summary": f"No valid health data available for {date.date()}. Please ensure your health tracking device is properly connected.",
-                    "status": "fair",
-                    "highlights": [
-                        "Device connection needed",
-                        "Health tracking ready to start"
-                    ],
-                    "recommendations": [
-                        "Check your device connection",
-                        "Verify your health tracking settings"
-                    ],
-                    "next_steps": "Connect your health tracking device"
-                }
-            }
-        
-        # Generate insights
-        insights = await llm_service.get_health_insights(metrics)
-        return {
-            "status": "success",
-            "insights": insights
-        }
+
+        # Only days that have fully ended are cached; today's keep changing
+        if date + timedelta(days=1) > _start_of_today():
+            result, _ = await _daily_insights(date)
+            return ORJSONResponse(result)
+
+        cache_key = f"insights:daily:{date.isoformat()}"
+        cached, cache_slot = await cache_service.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+
+        result, cacheable = await _daily_insights(date)
+        if cacheable:
+            await cache_service.set(cache_slot, result, DAILY_INSIGHTS_CACHE_TTL)
+        return ORJSONResponse(result)
     except Exception as e:
-        logger.error(f"Error generating daily insights: {str(e)}")
+        logger.error("Error generating daily insights: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate daily insights: {str(e)}"
@@ -327,4 +596,12 @@ async def get_daily_insights(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    ) 
\ No newline at end of file
@@ -7,12 +7,7 @@ import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import sys
-import os
-import random
-
-# Add the parent directory to the path so we can import our services
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
 
 from services.health_data.service import HealthDataService
 from services.health_data.models import SleepData, HeartRateData, WeightData, SleepPhase
@@ -20,123 +15,150 @@ from services.health_data.models import SleepData, HeartRateData, WeightData, Sl
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# One heart rate reading per hour of the day, as minute offsets from midnight
+HOUR_OFFSETS = np.arange(24) * 60
+
+# Lowest heart rate for each hour based on time of day: morning, afternoon,
+# evening, and night as the default; readings range HR_SPAN above it
+_hours = np.arange(24)
+HR_LOWS = np.select(
+    [(_hours >= 6) & (_hours <= 8), (_hours >= 12) & (_hours <= 14), (_hours >= 18) & (_hours <= 20)],
+    [65, 70, 75],
+    default=55
+)
+HR_SPAN = 20
+RESTING_HR_MIN = 50
+RESTING_HR_MAX = 65
+ACTIVITY_TYPES = (None, "resting", "walking", "sleeping")
+
+# Sleep from 10 PM to 6 AM (8 hours)
+SLEEP_START_HOUR = 22
+SLEEP_DURATION = timedelta(hours=8)
+TOTAL_SLEEP_MINUTES = 480
+
+# Weight around 70kg, with BMI for a height of 1.75m
+BASE_WEIGHT = 70.0
+HEIGHT = 1.75
+
 class TestDataGenerator:
-    def __init__(self):
-        self.health_service = HealthDataService()
+    def __init__(self, seed: int | None = None):
+        # Test data can simply be regenerated, so skip fsync on its bulk writes
+        self.health_service = HealthDataService(bulk_synchronous="OFF")
+        # Single generator for every random draw; pass a seed for reproducible data
+        self.rng = np.random.default_rng(seed)
     
-    def generate_sleep_data(self, date: datetime) -> SleepData:
-        """Generate realistic sleep data for a given date"""
-        # Sleep from 10 PM to 6 AM (8 hours)
-        start_time = date.replace(hour=22, minute=0, second=0, microsecond=0)
-        end_time = start_time + timedelta(hours=8)
-        
-        # Generate realistic sleep phases (total should be ~480 minutes)
-        total_sleep = 480
-        deep_sleep = random.randint(60, 120)  # 1-2 hours
-        rem_sleep = random.randint(90, 150)   # 1.5-2.5 hours
-        light_sleep = total_sleep - deep_sleep - rem_sleep
-        awake_time = random.randint(10, 30)   # 10-30 minutes awake
-        
-        quality = random.randint(70, 95)  # Sleep quality 70-95
+    def generate_sleep_data(self, dates: list[datetime]) -> list[SleepData]:
+        """Generate realistic sleep data for the given dates (one session per date)"""
+        # Draw every night's phases in one vectorized pass; total should be ~480 minutes
+        n_days = len(dates)
+        deep_sleep = self.rng.integers(60, 121, size=n_days)  # 1-2 hours
+        rem_sleep = self.rng.integers(90, 151, size=n_days)   # 1.5-2.5 hours
+        light_sleep = TOTAL_SLEEP_MINUTES - deep_sleep - rem_sleep
+        awake_time = self.rng.integers(10, 31, size=n_days)   # 10-30 minutes awake
         
-        return SleepData(
-            start_time=start_time,
-            end_time=end_time,
-            quality=quality,
-            phases=SleepPhase(
-                deep=deep_sleep,
-                light=light_sleep,
-                rem=rem_sleep,
-                awake=awake_time
-            ),
-            source="test_data"
-        )
-    
-    def generate_heart_rate_data(self, date: datetime) -> list[HeartRateData]:
-        """Generate heart rate data for a given date (multiple readings)"""
-        heart_rate_data = []
+        quality = self.rng.integers(70, 96, size=n_days)  # Sleep quality 70-95
         
-        # Generate 24 readings (one per hour)
-        for hour in range(24):
-            timestamp = date.replace(hour=hour, minute=random.randint(0, 59), second=0, microsecond=0)
-            
-            # Different heart rates based on time of day
-            if 6 <= hour <= 8:  # Morning
-                value = random.randint(65, 85)
-            elif 12 <= hour <= 14:  # Afternoon
-                value = random.randint(70, 90)
-            elif 18 <= hour <= 20:  # Evening
-                value = random.randint(75, 95)
-            else:  # Night
-                value = random.randint(55, 75)
-            
-            resting_rate = random.randint(50, 65)
-            activity_type = random.choice([None, "resting", "walking", "sleeping"])
-            
-            heart_rate_data.append(HeartRateData(
-                timestamp=timestamp,
-                value=value,
-                resting_rate=resting_rate,
-                activity_type=activity_type,
+        sessions = []
+        for date, night_quality, deep, light, rem, awake in zip(
+            dates, quality.tolist(), deep_sleep.tolist(), light_sleep.tolist(),
+            rem_sleep.tolist(), awake_time.tolist()
+        ):
+            start_time = date.replace(hour=SLEEP_START_HOUR, minute=0, second=0, microsecond=0)
+            sessions.append(SleepData(
+                start_time=start_time,
+                end_time=start_time + SLEEP_DURATION,
+                quality=night_quality,
+                phases=SleepPhase(deep=deep, light=light, rem=rem, awake=awake),
                 source="test_data"
             ))
-        
-        return heart_rate_data
+        return sessions
     
-    def generate_weight_data(self, date: datetime) -> WeightData:
-        """Generate weight data for a given date"""
-        # Base weight around 70kg with small daily variations
-        base_weight = 70.0
-        daily_variation = random.uniform(-0.5, 0.5)
-        weight = base_weight + daily_variation
-        
-        # Calculate BMI (assuming height of 1.75m)
-        height = 1.75
-        bmi = weight / (height * height)
+    def generate_heart_rate_data(self, dates: list[datetime]) -> list[list[HeartRateData]]:
+        """Generate heart rate data for the given dates (24 readings per date)"""
+        # Draw every reading for every date in one vectorized pass
+        n_days = len(dates)
+        values = self.rng.integers(HR_LOWS, HR_LOWS + HR_SPAN + 1, size=(n_days, 24))
+        minutes = self.rng.integers(0, 60, size=(n_days, 24))
+        resting_rates = self.rng.integers(RESTING_HR_MIN, RESTING_HR_MAX + 1, size=(n_days, 24))
+        activities = self.rng.integers(0, len(ACTIVITY_TYPES), size=(n_days, 24))
         
-        timestamp = date.replace(hour=8, minute=0, second=0, microsecond=0)
-        
-        return WeightData(
-            timestamp=timestamp,
-            value=weight,
-            bmi=bmi,
-            body_composition=None,  # Keep it simple for test data
-            source="test_data"
+        # Timestamps are UTC midnight of each date plus a per-reading minute
+        # offset, formatted to ISO strings in one call
+        midnights = np.array(
+            [d.astimezone(timezone.utc).replace(tzinfo=None).date() for d in dates],
+            dtype='datetime64[m]'
         )
+        times = midnights[:, None] + (HOUR_OFFSETS + minutes).astype('timedelta64[m]')
+        timestamps = np.datetime_as_string(times, unit='s', timezone='UTC')
+        
+        return [
+            [
+                HeartRateData(
+                    timestamp=timestamp,
+                    value=value,
+                    resting_rate=resting_rate,
+                    activity_type=ACTIVITY_TYPES[activity],
+                    source="test_data"
+                )
+                for timestamp, value, resting_rate, activity in zip(
+                    day_timestamps, day_values, day_resting, day_activities
+                )
+            ]
+            for day_timestamps, day_values, day_resting, day_activities in zip(
+                timestamps.tolist(), values.tolist(), resting_rates.tolist(), activities.tolist()
+            )
+        ]
     
-    async def add_test_data_for_date(self, date: datetime):
-        """Add test data for a specific date"""
-        try:
-            # Add sleep data
-            sleep_data = self.generate_sleep_data(date)
-            await self.health_service.store_sleep_data(sleep_data)
-            logger.info(f"Added sleep data for {date.date()}")
-            
-            # Add heart rate data (multiple readings)
-            heart_rate_data_list = self.generate_heart_rate_data(date)
-            for hr_data in heart_rate_data_list:
-                await self.health_service.store_heart_rate_data(hr_data)
-            logger.info(f"Added {len(heart_rate_data_list)} heart rate readings for {date.date()}")
-            
-            # Add weight data
-            weight_data = self.generate_weight_data(date)
-            await self.health_service.store_weight_data(weight_data)
-            logger.info(f"Added weight data for {date.date()}")
-            
-        except Exception as e:
-            logger.error(f"Error adding test data for {date.date()}: {e}")
+    def generate_weight_data(self, dates: list[datetime]) -> list[WeightData]:
+        """Generate weight data for the given dates (one measurement per date)"""
+        # Small daily variations around the base weight, with BMI computed
+        # for every date in one vectorized pass
+        weights = BASE_WEIGHT + self.rng.uniform(-0.5, 0.5, size=len(dates))
+        bmis = weights / (HEIGHT * HEIGHT)
+        
+        return [
+            WeightData(
+                timestamp=date.replace(hour=8, minute=0, second=0, microsecond=0),
+                value=weight,
+                bmi=bmi,
+                body_composition=None,  # Keep it simple for test data
+                source="test_data"
+            )
+            for date, weight, bmi in zip(dates, weights.tolist(), bmis.tolist())
+        ]
     
     async def add_recent_test_data(self, days: int = 7):
         """Add test data for the last N days"""
-        logger.info(f"Adding test data for the last {days} days...")
+        logger.info("Adding test data for the last %s days...", days)
         
         end_date = datetime.now(timezone.utc)
+        dates = [end_date - timedelta(days=i) for i in range(days)]
         
-        for i in range(days):
-            date = end_date - timedelta(days=i)
-            await self.add_test_data_for_date(date)
+        try:
+            # Generate every day's data first, then store each metric in one
+            # bulk insert, all committed together
+            sleep_data = self.generate_sleep_data(dates)
+            heart_rate_data = [hr for day in self.generate_heart_rate_data(dates) for hr in day]
+            weight_data = self.generate_weight_data(dates)
+            
+            await self.health_service.begin_bulk()
+            try:
+                await self.health_service.store_sleep_bulk(sleep_data)
+                logger.info("Added %s sleep records", len(sleep_data))
+                
+                await self.health_service.store_heart_rate_bulk(heart_rate_data)
+                logger.info("Added %s heart rate readings", len(heart_rate_data))
+                
+                await self.health_service.store_weight_bulk(weight_data)
+                logger.info("Added %s weight records", len(weight_data))
+            finally:
+                await self.health_service.commit_bulk()
+            
+        except Exception as e:
+            logger.error("Error adding test data: %s", e)
+            return
         
-        logger.info(f"Successfully added test data for {days} days")
+        logger.info("Successfully added test data for %s days", days)
 
 async def main():
     """Main function to run the test data generation"""
@@ -0,0 +1,91 @@
+from typing import Any, Optional, Tuple
+import os
+import orjson
+import logging
+import redis.asyncio as redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait on Redis before treating an operation as a miss
+REDIS_TIMEOUT = 0.25
+
+
+class CacheService:
+    def __init__(self, url: Optional[str] = None, prefix: str = "hd"):
+        """Initialize the Redis-backed response cache.
+
+        Caching is disabled when no REDIS_URL is configured, and every
+        operation degrades to a miss if Redis is unreachable. Keys are
+        grouped into namespaces by their first ":"-separated segment, and
+        each namespace carries a generation number that invalidate bumps.
+        """
+        self.url = url or os.getenv('REDIS_URL')
+        self.prefix = prefix
+        self.client = redis.from_url(
+            self.url,
+            socket_connect_timeout=REDIS_TIMEOUT,
+            socket_timeout=REDIS_TIMEOUT
+        ) if self.url else None
+
+        if self.client:
+            logger.info("Initialized response cache with Redis")
+        else:
+            logger.info("REDIS_URL not set, response cache disabled")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _generation_key(self, namespace: str) -> str:
+        return self._key(f"gen:{namespace}")
+
+    async def _versioned_key(self, key: str) -> str:
+        """Qualify key with the current generation of its namespace"""
+        namespace = key.split(":", 1)[0]
+        generation = await self.client.get(self._generation_key(namespace))
+        return self._key(f"{int(generation or 0)}:{key}")
+
+    async def get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Return the cached value for key, or None on a miss, and the slot
+        to pass to set when storing a freshly computed value.
+
+        The slot pins the namespace generation seen here, so a value computed
+        before an invalidation is stored under the old generation and never
+        served.
+        """
+        if not self.client:
+            return None, None
+        try:
+            slot = await self._versioned_key(key)
+            cached = await self.client.get(slot)
+            return (orjson.loads(cached) if cached is not None else None), slot
+        except Exception as e:
+            logger.warning("Cache read failed for %s: %s", key, e)
+            return None, None
+
+    async def set(self, slot: Optional[str], value: Any, ttl: int) -> None:
+        """Store value for ttl seconds in a slot returned by get"""
+        if not self.client or slot is None:
+            return
+        try:
+            await self.client.setex(slot, ttl, orjson.dumps(value))
+        except Exception as e:
+            logger.warning("Cache write failed for %s: %s", slot, e)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Drop every cached key in the given namespaces.
+
+        Bumping the namespace generation orphans the old keys in O(1) rather
+        than scanning for them; they expire on their own TTL.
+        """
+        if not self.client:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for namespace in namespaces:
+                pipe.incr(self._generation_key(namespace))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Cache invalidation failed: %s", e)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 from enum import Enum
 
 class MetricType(str, Enum):
@@ -14,7 +14,8 @@ class SleepPhase(BaseModel):
     rem: int = Field(..., description="REM sleep duration in minutes")
     awake: int = Field(..., description="Awake duration in minutes")
 
-    @validator('deep', 'light', 'rem', 'awake')
+    @field_validator('deep', 'light', 'rem', 'awake')
+    @classmethod
     def validate_duration(cls, v):
         if v < 0:
             raise ValueError("Duration cannot be negative")
@@ -27,9 +28,10 @@ class SleepData(BaseModel):
     phases: SleepPhase = Field(..., description="Sleep phases")
     source: str = Field(..., description="Data source (e.g., 'mobile_app', 'manual')")
     
-    @validator('end_time')
-    def validate_times(cls, v, values):
-        if 'start_time' in values and v <= values['start_time']:
+    @field_validator('end_time')
+    @classmethod
+    def validate_times(cls, v, info: ValidationInfo):
+        if 'start_time' in info.data and v <= info.data['start_time']:
             raise ValueError("end_time must be after start_time")
         return v
 
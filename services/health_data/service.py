@@ -1,9 +1,15 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+import asyncio
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from itertools import chain, islice
 import json
 import logging
 from pathlib import Path
+import queue
 import sqlite3
+import threading
 from .models import (
     MetricType, SleepData, HeartRateData, WeightData,
     HealthDataResponse, HealthDataError
@@ -11,16 +17,374 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Bump when _init_db changes so existing databases rerun it
+SCHEMA_VERSION = 1
+
+# Rows handed to executemany at a time by the bulk inserters
+BULK_BATCH_SIZE = 10_000
+
+# Bound parameters per multi-row INSERT, within SQLite's historical limit of 999
+MAX_INSERT_PARAMS = 999
+
+# Read-only connections handed out to concurrent queries
+READ_POOL_SIZE = 4
+
+# Rows fetched per chunk when streaming recent data
+RECENT_CHUNK_SIZE = 1000
+
+# Bytes of the database file each connection reads through mmap
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Page size for new databases; it cannot change once WAL is enabled
+PAGE_SIZE = 8192
+
+_SLEEP_INSERT = '''
+INSERT INTO sleep (
+    start_time, end_time, quality,
+    deep_sleep, light_sleep, rem_sleep, awake_time,
+    source
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_HEART_RATE_INSERT = '''
+INSERT INTO heart_rate (
+    timestamp, value,
+    resting_rate, activity_type, source
+) VALUES (?, ?, ?, ?, ?)
+'''
+
+_WEIGHT_INSERT = '''
+INSERT INTO weight (
+    timestamp, value, bmi,
+    body_fat, muscle_mass, water_percentage,
+    bone_mass, source
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_SQL = {
+    MetricType.SLEEP: _SLEEP_INSERT,
+    MetricType.HEART_RATE: _HEART_RATE_INSERT,
+    MetricType.WEIGHT: _WEIGHT_INSERT,
+}
+
+def _heart_rate_params(d: HeartRateData) -> tuple:
+    """Bind parameters for _HEART_RATE_INSERT"""
+    return (
+        d.timestamp.isoformat(),
+        d.value,
+        d.resting_rate,
+        d.activity_type,
+        d.source
+    )
+
+# A day's sleep, heart rate and weight rows in one statement, padded to a
+# shared column layout and tagged with their source table in "kind"
+_SUMMARY_SLEEP, _SUMMARY_HEART_RATE, _SUMMARY_WEIGHT = 0, 1, 2
+
+_DAILY_SUMMARY_SELECT = '''
+SELECT
+    0 AS kind, id, start_time AS ts, end_time, quality AS value,
+    deep_sleep, light_sleep, rem_sleep, awake_time,
+    NULL AS resting_rate, NULL AS activity_type,
+    NULL AS bmi, NULL AS body_fat, NULL AS muscle_mass,
+    NULL AS water_percentage, NULL AS bone_mass,
+    source, created_at
+FROM sleep
+WHERE start_time >= :start AND start_time < :end
+UNION ALL
+SELECT
+    1, id, timestamp, NULL, value,
+    NULL, NULL, NULL, NULL,
+    resting_rate, activity_type,
+    NULL, NULL, NULL,
+    NULL, NULL,
+    source, created_at
+FROM heart_rate
+WHERE timestamp >= :start AND timestamp < :end
+UNION ALL
+SELECT
+    2, id, timestamp, NULL, value,
+    NULL, NULL, NULL, NULL,
+    NULL, NULL,
+    bmi, body_fat, muscle_mass,
+    water_percentage, bone_mass,
+    source, created_at
+FROM weight
+WHERE timestamp >= :start AND timestamp < :end
+'''
+
+_RECENT_SELECT = {
+    MetricType.SLEEP: '''
+SELECT
+    id,
+    start_time,
+    end_time,
+    quality,
+    deep_sleep,
+    light_sleep,
+    rem_sleep,
+    awake_time,
+    source,
+    created_at
+FROM sleep
+WHERE start_time >= ?
+ORDER BY start_time DESC
+''',
+    MetricType.HEART_RATE: '''
+SELECT
+    id,
+    timestamp,
+    value,
+    resting_rate,
+    activity_type,
+    source,
+    created_at
+FROM heart_rate
+WHERE timestamp >= ?
+ORDER BY timestamp DESC
+''',
+    MetricType.WEIGHT: '''
+SELECT
+    id,
+    timestamp,
+    value,
+    bmi,
+    body_fat,
+    muscle_mass,
+    water_percentage,
+    bone_mass,
+    source,
+    created_at
+FROM weight
+WHERE timestamp >= ?
+ORDER BY timestamp DESC
+''',
+}
+
+_HEART_RATE_ROLLUP_SELECT = '''
+SELECT
+    substr(timestamp, 1, 10) AS date,
+    AVG(value) AS avg_rate,
+    MIN(value) AS min_rate,
+    MAX(value) AS max_rate,
+    AVG(resting_rate) AS resting_rate,
+    COUNT(*) AS samples
+FROM heart_rate
+WHERE timestamp >= ?
+GROUP BY date
+ORDER BY date DESC
+'''
+
+# Per-day totals and averages across all three tables, as a single row
+_DAILY_AGGREGATES_SELECT = '''
+WITH
+    s AS (
+        SELECT
+            COUNT(*) AS sleep_sessions,
+            SUM(deep_sleep + light_sleep + rem_sleep) AS sleep_minutes,
+            AVG(quality) AS avg_sleep_quality
+        FROM sleep
+        WHERE start_time >= :start AND start_time < :end
+    ),
+    h AS (
+        SELECT
+            COUNT(*) AS heart_rate_samples,
+            AVG(value) AS avg_heart_rate,
+            MIN(value) AS min_heart_rate,
+            MAX(value) AS max_heart_rate,
+            AVG(resting_rate) AS avg_resting_heart_rate
+        FROM heart_rate
+        WHERE timestamp >= :start AND timestamp < :end
+    ),
+    w AS (
+        SELECT
+            COUNT(*) AS weight_measurements,
+            AVG(value) AS avg_weight,
+            AVG(bmi) AS avg_bmi
+        FROM weight
+        WHERE timestamp >= :start AND timestamp < :end
+    )
+SELECT * FROM s, h, w
+'''
+
+def _sleep_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Shape a sleep row with its phases nested"""
+    return {
+        "id": row["id"],
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "quality": row["quality"],
+        "phases": {
+            "deep": row["deep_sleep"],
+            "light": row["light_sleep"],
+            "rem": row["rem_sleep"],
+            "awake": row["awake_time"]
+        },
+        "source": row["source"],
+        "created_at": row["created_at"]
+    }
+
+def _weight_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Shape a weight row with its body composition nested"""
+    return {
+        "id": row["id"],
+        "timestamp": row["timestamp"],
+        "value": row["value"],
+        "bmi": row["bmi"],
+        "body_composition": {
+            "body_fat": row["body_fat"],
+            "muscle_mass": row["muscle_mass"],
+            "water_percentage": row["water_percentage"],
+            "bone_mass": row["bone_mass"]
+        } if row["body_fat"] is not None else None,
+        "source": row["source"],
+        "created_at": row["created_at"]
+    }
+
+# Heart rate rows are flat and go through _fetch_dicts instead
+_ROW_BUILDERS = {
+    MetricType.SLEEP: _sleep_row,
+    MetricType.WEIGHT: _weight_row,
+}
+
+@lru_cache(maxsize=None)
+def _multi_row_insert(sql: str) -> Tuple[str, int]:
+    """Expand a single-row INSERT into one inserting as many rows as fit in
+    MAX_INSERT_PARAMS, returning the statement and its row count"""
+    head, _, group = sql.rstrip().rpartition(' VALUES ')
+    rows = MAX_INSERT_PARAMS // group.count('?')
+    return f"{head} VALUES {', '.join([group] * rows)}", rows
+
+def _fetch_dicts(cursor: sqlite3.Cursor, size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Fetch the remaining rows, or at most size of them, as flat dicts,
+    reading column names once"""
+    # Plain tuples skip building an sqlite3.Row per row
+    cursor.row_factory = None
+    columns = [column[0] for column in cursor.description]
+    rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+    return [dict(zip(columns, row)) for row in rows]
+
 class HealthDataService:
-    def __init__(self, db_path: str = "HealthData/health_data.db"):
-        """Initialize the health data service"""
+    def __init__(
+        self,
+        db_path: str = "HealthData/health_data.db",
+        batch_window: float = 0.01,
+        bulk_synchronous: Optional[str] = None
+    ):
+        """Initialize the health data service.
+
+        Single heart rate readings that arrive within batch_window seconds of
+        each other are written to the database in one insert. When set,
+        bulk_synchronous is applied as PRAGMA synchronous on the connection
+        opened by begin_bulk, e.g. "OFF" for one-shot imports that can be
+        rerun.
+        """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_window = batch_window
+        self.bulk_synchronous = bulk_synchronous
+        self._pending_heart_rate: List[Tuple[HeartRateData, asyncio.Future]] = []
+        self._heart_rate_flush: Optional[asyncio.Task] = None
+        # Shared connection holding an open transaction between begin_bulk
+        # and commit_bulk, serialized across to_thread workers by the lock
+        self._bulk_conn: Optional[sqlite3.Connection] = None
+        self._bulk_lock = threading.Lock()
+        # Long-lived connections so requests skip reopening the database
+        # file: one writer behind a lock, and a pool of read-only readers
+        # that WAL lets run alongside it
+        self._conn = self._connect()
+        self._conn_lock = threading.Lock()
         self._init_db()
+        self._readers: queue.SimpleQueue = queue.SimpleQueue()
+        for _ in range(READ_POOL_SIZE):
+            self._readers.put(self._connect(read_only=True))
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the per-connection pragmas applied.
+
+        Connections run in autocommit mode: reads never open a transaction,
+        and every write path issues its own BEGIN.
+        """
+        if read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                isolation_level=None
+            )
+        conn.row_factory = sqlite3.Row
+        # Under WAL, NORMAL only syncs at checkpoints; temp tables and a
+        # 64MB page cache stay in memory, and large scans read pages
+        # straight from the mapped file
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+        return conn
+    
+    @contextmanager
+    def _reader(self):
+        """Borrow a read-only connection from the pool"""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def _read(
+        self,
+        sql: str,
+        params: Union[tuple, Dict[str, Any]],
+        build: Optional[Callable[[sqlite3.Row], Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run a query on a pooled reader, shaping rows with build or as flat dicts"""
+        with self._reader() as conn:
+            cursor = conn.execute(sql, params)
+            if build is None:
+                return _fetch_dicts(cursor)
+            return list(map(build, cursor.fetchall()))
+    
+    @contextmanager
+    def _transaction(self):
+        """Hold the writer connection inside BEGIN IMMEDIATE ... COMMIT.
+
+        Taking the write lock up front means a conflicting writer waits at
+        BEGIN rather than failing part way through the transaction.
+        """
+        with self._conn_lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+    
+    def _write(self, sql: str, params: tuple):
+        """Run a single write on the shared writer connection and commit it"""
+        with self._transaction() as conn:
+            conn.execute(sql, params)
     
     def _init_db(self):
         """Initialize the SQLite database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn_lock:
+            # The schema is stamped with user_version once created, so later
+            # boots skip the DDL
+            if self._conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+                return
+            
+            # Only takes effect on a fresh file, before anything is written
+            self._conn.execute(f'PRAGMA page_size={PAGE_SIZE}')
+            # WAL lets readers proceed while a bulk write is in progress
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
             # Create sleep table
@@ -70,70 +434,221 @@ class HealthDataService:
             
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sleep_time ON sleep(start_time)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_hr_time ON heart_rate(timestamp)')
+            # Covers the daily rollup query, which then never reads the table;
+            # it supersedes the old timestamp-only index
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_hr_time_value ON heart_rate(timestamp, value, resting_rate)')
+            cursor.execute('DROP INDEX IF EXISTS idx_hr_time')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_weight_time ON weight(timestamp)')
             
-            conn.commit()
+            cursor.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
     
     async def store_sleep_data(self, data: SleepData) -> HealthDataResponse:
         """Store sleep data in the database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO sleep (
-                    start_time, end_time, quality,
-                    deep_sleep, light_sleep, rem_sleep, awake_time,
-                    source
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    data.start_time.isoformat(),
-                    data.end_time.isoformat(),
-                    data.quality,
-                    data.phases.deep,
-                    data.phases.light,
-                    data.phases.rem,
-                    data.phases.awake,
-                    data.source
-                ))
-                conn.commit()
+            await asyncio.to_thread(self._write, _SLEEP_INSERT, (
+                data.start_time.isoformat(),
+                data.end_time.isoformat(),
+                data.quality,
+                data.phases.deep,
+                data.phases.light,
+                data.phases.rem,
+                data.phases.awake,
+                data.source
+            ))
             
             return HealthDataResponse(
                 status="success",
                 message="Sleep data stored successfully"
             )
         except Exception as e:
-            logger.error(f"Error storing sleep data: {str(e)}")
+            logger.error("Error storing sleep data: %s", e)
             raise HealthDataError(
                 error="Failed to store sleep data",
                 details={"error": str(e)}
             )
     
+    def _bulk_connection(self) -> sqlite3.Connection:
+        """Open a connection for bulk inserts, applying bulk_synchronous"""
+        conn = self._connect()
+        if self.bulk_synchronous:
+            conn.execute(f"PRAGMA synchronous={self.bulk_synchronous}")
+        return conn
+    
+    def _open_bulk_transaction(self) -> sqlite3.Connection:
+        conn = self._bulk_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+        except Exception:
+            conn.close()
+            raise
+        return conn
+    
+    async def begin_bulk(self):
+        """Start one transaction that every bulk insert joins until commit_bulk.
+
+        Other writers wait on the database lock until the transaction ends.
+        """
+        if self._bulk_conn is not None:
+            raise HealthDataError(error="A bulk transaction is already open")
+        self._bulk_conn = await asyncio.to_thread(self._open_bulk_transaction)
+    
+    async def commit_bulk(self):
+        """Commit and close the transaction opened by begin_bulk"""
+        conn, self._bulk_conn = self._bulk_conn, None
+        if conn is None:
+            return
+        try:
+            await asyncio.to_thread(conn.commit)
+        finally:
+            conn.close()
+    
+    def _insert_batch(self, cursor: sqlite3.Cursor, sql: str, batch: List[tuple]):
+        """Insert batch with multi-row INSERTs, leaving any remainder to executemany"""
+        multi_sql, per_statement = _multi_row_insert(sql)
+        full = len(batch) - len(batch) % per_statement
+        for start in range(0, full, per_statement):
+            cursor.execute(
+                multi_sql,
+                list(chain.from_iterable(batch[start:start + per_statement]))
+            )
+        if full < len(batch):
+            cursor.executemany(sql, batch[full:])
+    
+    def _executemany_chunks(self, cursor: sqlite3.Cursor, sql: str, rows: Iterable[tuple]) -> int:
+        """Insert rows in BULK_BATCH_SIZE chunks inside the open transaction.
+
+        A chunk that violates a constraint is rolled back and retried row by
+        row, so only the offending rows are skipped.
+        """
+        count = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, BULK_BATCH_SIZE)):
+            cursor.execute('SAVEPOINT batch')
+            try:
+                self._insert_batch(cursor, sql, batch)
+                count += len(batch)
+            except sqlite3.IntegrityError:
+                cursor.execute('ROLLBACK TO batch')
+                for row in batch:
+                    try:
+                        cursor.execute(sql, row)
+                        count += 1
+                    except sqlite3.IntegrityError as e:
+                        logger.warning("Skipping row %s: %s", row, e)
+            cursor.execute('RELEASE batch')
+        return count
+    
+    def _insert_rows(self, sql: str, rows: Iterable[tuple]) -> int:
+        """Insert rows in their own transaction on the shared writer connection"""
+        with self._transaction() as conn:
+            return self._executemany_chunks(conn.cursor(), sql, rows)
+    
+    def _executemany_batched(self, sql: str, rows: Iterable[tuple]) -> int:
+        """Insert rows in the bulk transaction if one is open, else in a new one"""
+        if self._bulk_conn is not None:
+            with self._bulk_lock:
+                cursor = self._bulk_conn.cursor()
+                # Undo only this call's rows if it fails part way through
+                cursor.execute('SAVEPOINT bulk_call')
+                try:
+                    count = self._executemany_chunks(cursor, sql, rows)
+                except Exception:
+                    cursor.execute('ROLLBACK TO bulk_call')
+                    raise
+                finally:
+                    cursor.execute('RELEASE bulk_call')
+            return count
+        
+        return self._insert_rows(sql, rows)
+    
+    def _insert_sleep_rows(self, data: Iterable[SleepData]) -> int:
+        """Insert sleep sessions in a single transaction"""
+        return self._executemany_batched(_SLEEP_INSERT, ((
+            d.start_time.isoformat(),
+            d.end_time.isoformat(),
+            d.quality,
+            d.phases.deep,
+            d.phases.light,
+            d.phases.rem,
+            d.phases.awake,
+            d.source
+        ) for d in data))
+    
+    async def store_sleep_bulk(self, data: Iterable[SleepData]) -> HealthDataResponse:
+        """Store many sleep sessions in one insert"""
+        try:
+            count = await asyncio.to_thread(self._insert_sleep_rows, data)
+            
+            return HealthDataResponse(
+                status="success",
+                message=f"Stored {count} sleep sessions",
+                data={"count": count}
+            )
+        except Exception as e:
+            logger.error("Error storing sleep data: %s", e)
+            raise HealthDataError(
+                error="Failed to store sleep data",
+                details={"error": str(e)}
+            )
+    
+    def _insert_heart_rate_rows(self, data: Iterable[HeartRateData]) -> int:
+        """Insert heart rate readings in a single transaction"""
+        return self._executemany_batched(
+            _HEART_RATE_INSERT, map(_heart_rate_params, data)
+        )
+    
     async def store_heart_rate_data(self, data: HeartRateData) -> HealthDataResponse:
-        """Store heart rate data in the database"""
+        """Store heart rate data in the database, batched with concurrent readings"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending_heart_rate.append((data, future))
+        if self._heart_rate_flush is None:
+            self._heart_rate_flush = asyncio.create_task(self._flush_heart_rate())
+        await future
+        
+        return HealthDataResponse(
+            status="success",
+            message="Heart rate data stored successfully"
+        )
+    
+    async def _flush_heart_rate(self):
+        """Write every heart rate reading queued during the batch window"""
+        await asyncio.sleep(self.batch_window)
+        batch, self._pending_heart_rate = self._pending_heart_rate, []
+        self._heart_rate_flush = None
+        
+        try:
+            # Live readings never join an import's bulk transaction
+            await asyncio.to_thread(
+                self._insert_rows,
+                _HEART_RATE_INSERT,
+                [_heart_rate_params(data) for data, _ in batch]
+            )
+        except Exception as e:
+            logger.error("Error storing heart rate data: %s", e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(HealthDataError(
+                        error="Failed to store heart rate data",
+                        details={"error": str(e)}
+                    ))
+            return
+        
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+    
+    async def store_heart_rate_bulk(self, data: Iterable[HeartRateData]) -> HealthDataResponse:
+        """Store many heart rate readings in one insert"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO heart_rate (
-                    timestamp, value,
-                    resting_rate, activity_type, source
-                ) VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    data.timestamp.isoformat(),
-                    data.value,
-                    data.resting_rate,
-                    data.activity_type,
-                    data.source
-                ))
-                conn.commit()
+            count = await asyncio.to_thread(self._insert_heart_rate_rows, data)
             
             return HealthDataResponse(
                 status="success",
-                message="Heart rate data stored successfully"
+                message=f"Stored {count} heart rate readings",
+                data={"count": count}
             )
         except Exception as e:
-            logger.error(f"Error storing heart rate data: {str(e)}")
+            logger.error("Error storing heart rate data: %s", e)
             raise HealthDataError(
                 error="Failed to store heart rate data",
                 details={"error": str(e)}
@@ -142,37 +657,85 @@ class HealthDataService:
     async def store_weight_data(self, data: WeightData) -> HealthDataResponse:
         """Store weight data in the database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO weight (
-                    timestamp, value, bmi,
-                    body_fat, muscle_mass, water_percentage,
-                    bone_mass, source
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    data.timestamp.isoformat(),
-                    data.value,
-                    data.bmi,
-                    data.body_composition.body_fat if data.body_composition else None,
-                    data.body_composition.muscle_mass if data.body_composition else None,
-                    data.body_composition.water_percentage if data.body_composition else None,
-                    data.body_composition.bone_mass if data.body_composition else None,
-                    data.source
-                ))
-                conn.commit()
+            await asyncio.to_thread(self._write, _WEIGHT_INSERT, (
+                data.timestamp.isoformat(),
+                data.value,
+                data.bmi,
+                data.body_composition.body_fat if data.body_composition else None,
+                data.body_composition.muscle_mass if data.body_composition else None,
+                data.body_composition.water_percentage if data.body_composition else None,
+                data.body_composition.bone_mass if data.body_composition else None,
+                data.source
+            ))
             
             return HealthDataResponse(
                 status="success",
                 message="Weight data stored successfully"
             )
         except Exception as e:
-            logger.error(f"Error storing weight data: {str(e)}")
+            logger.error("Error storing weight data: %s", e)
             raise HealthDataError(
                 error="Failed to store weight data",
                 details={"error": str(e)}
             )
     
+    def _insert_weight_rows(self, data: Iterable[WeightData]) -> int:
+        """Insert weight measurements in a single transaction"""
+        return self._executemany_batched(_WEIGHT_INSERT, ((
+            d.timestamp.isoformat(),
+            d.value,
+            d.bmi,
+            d.body_composition.body_fat if d.body_composition else None,
+            d.body_composition.muscle_mass if d.body_composition else None,
+            d.body_composition.water_percentage if d.body_composition else None,
+            d.body_composition.bone_mass if d.body_composition else None,
+            d.source
+        ) for d in data))
+    
+    async def store_weight_bulk(self, data: Iterable[WeightData]) -> HealthDataResponse:
+        """Store many weight measurements in one insert"""
+        try:
+            count = await asyncio.to_thread(self._insert_weight_rows, data)
+            
+            return HealthDataResponse(
+                status="success",
+                message=f"Stored {count} weight measurements",
+                data={"count": count}
+            )
+        except Exception as e:
+            logger.error("Error storing weight data: %s", e)
+            raise HealthDataError(
+                error="Failed to store weight data",
+                details={"error": str(e)}
+            )
+    
+    async def store_rows(
+        self,
+        metric_type: MetricType,
+        rows: Iterable[tuple]
+    ) -> HealthDataResponse:
+        """Store pre-built parameter tuples without model validation.
+
+        Rows must match the column order of the metric's bulk insert and are
+        meant for trusted sources such as storage imports.
+        """
+        try:
+            count = await asyncio.to_thread(
+                self._executemany_batched, _INSERT_SQL[metric_type], rows
+            )
+            
+            return HealthDataResponse(
+                status="success",
+                message=f"Stored {count} {metric_type.value} rows",
+                data={"count": count}
+            )
+        except Exception as e:
+            logger.error("Error storing %s data: %s", metric_type.value, e)
+            raise HealthDataError(
+                error=f"Failed to store {metric_type.value} data",
+                details={"error": str(e)}
+            )
+    
     async def get_recent_data(
         self,
         metric_type: MetricType,
@@ -180,37 +743,114 @@ class HealthDataService:
     ) -> List[Dict[str, Any]]:
         """Get recent health data for a specific metric type"""
         try:
-            end_date = datetime.now(timezone.utc)
-            start_date = end_date - timedelta(days=days)
+            if metric_type not in _RECENT_SELECT:
+                raise ValueError(f"Unsupported metric type: {metric_type}")
+            start_date = datetime.now(timezone.utc) - timedelta(days=days)
+            
+            return await asyncio.to_thread(
+                self._read,
+                _RECENT_SELECT[metric_type],
+                (start_date.isoformat(),),
+                _ROW_BUILDERS.get(metric_type)
+            )
+        
+        except Exception as e:
+            logger.error("Error retrieving %s data: %s", metric_type, e)
+            raise HealthDataError(
+                error=f"Failed to retrieve {metric_type} data",
+                details={"error": str(e)}
+            )
+    
+    def iter_recent_data(
+        self,
+        metric_type: MetricType,
+        days: int = 7,
+        chunk_size: int = RECENT_CHUNK_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield recent health data in chunks of up to chunk_size records.
+
+        This blocks on SQLite between chunks, so iterate it from a worker
+        thread. The query runs on its own read-only connection rather than a
+        pooled one, since a slow consumer can hold it for a long time; the
+        connection is closed when the iterator is exhausted or closed.
+        """
+        if metric_type not in _RECENT_SELECT:
+            raise HealthDataError(error=f"Unsupported metric type: {metric_type}")
+        start_date = datetime.now(timezone.utc) - timedelta(days=days)
+        
+        with closing(self._connect(read_only=True)) as conn:
+            cursor = conn.execute(_RECENT_SELECT[metric_type], (start_date.isoformat(),))
+            if metric_type == MetricType.HEART_RATE:
+                while chunk := _fetch_dicts(cursor, chunk_size):
+                    yield chunk
+                return
+            
+            build = _ROW_BUILDERS[metric_type]
+            while chunk := cursor.fetchmany(chunk_size):
+                yield [build(row) for row in chunk]
+    
+    async def get_heart_rate_rollups(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Get per-day average/min/max/resting heart rate for recent days"""
+        try:
+            start_date = datetime.now(timezone.utc) - timedelta(days=days)
+            
+            return await asyncio.to_thread(
+                self._read, _HEART_RATE_ROLLUP_SELECT, (start_date.isoformat(),)
+            )
+        
+        except Exception as e:
+            logger.error("Error retrieving heart rate rollups: %s", e)
+            raise HealthDataError(
+                error="Failed to retrieve heart rate rollups",
+                details={"error": str(e)}
+            )
+    
+    async def get_daily_aggregates(self, date: datetime) -> Dict[str, Any]:
+        """Get sleep, heart rate and weight totals/averages for a specific day"""
+        try:
+            # Ensure date is UTC-aware
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            end_date = date + timedelta(days=1)
+            
+            rows = await asyncio.to_thread(self._read, _DAILY_AGGREGATES_SELECT, {
+                "start": date.isoformat(),
+                "end": end_date.isoformat()
+            })
+            return {"date": date.isoformat(), **rows[0]}
+        
+        except Exception as e:
+            logger.error("Error retrieving daily aggregates: %s", e)
+            raise HealthDataError(
+                error="Failed to retrieve daily aggregates",
+                details={"error": str(e)}
+            )
+    
+    async def get_daily_summary(
+        self,
+        date: datetime
+    ) -> Dict[str, Any]:
+        """Get a summary of health metrics for a specific day"""
+        try:
+            # Ensure date is UTC-aware
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            end_date = date + timedelta(days=1)
             
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                if metric_type == MetricType.SLEEP:
-                    cursor.execute('''
-                    SELECT 
-                        id,
-                        start_time,
-                        end_time,
-                        quality,
-                        deep_sleep,
-                        light_sleep,
-                        rem_sleep,
-                        awake_time,
-                        source,
-                        created_at
-                    FROM sleep
-                    WHERE start_time >= ?
-                    ORDER BY start_time DESC
-                    ''', (start_date.isoformat(),))
-                    
-                    rows = cursor.fetchall()
-                    return [{
+            rows = await asyncio.to_thread(self._read, _DAILY_SUMMARY_SELECT, {
+                "start": date.isoformat(),
+                "end": end_date.isoformat()
+            })
+            
+            sleep_data, heart_rate_data, weight_data = [], [], []
+            for row in rows:
+                kind = row["kind"]
+                if kind == _SUMMARY_SLEEP:
+                    sleep_data.append({
                         "id": row["id"],
-                        "start_time": row["start_time"],
+                        "start_time": row["ts"],
                         "end_time": row["end_time"],
-                        "quality": row["quality"],
+                        "quality": row["value"],
                         "phases": {
                             "deep": row["deep_sleep"],
                             "light": row["light_sleep"],
@@ -219,56 +859,21 @@ class HealthDataService:
                         },
                         "source": row["source"],
                         "created_at": row["created_at"]
-                    } for row in rows]
-                
-                elif metric_type == MetricType.HEART_RATE:
-                    cursor.execute('''
-                    SELECT 
-                        id,
-                        timestamp,
-                        value,
-                        resting_rate,
-                        activity_type,
-                        source,
-                        created_at
-                    FROM heart_rate
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp DESC
-                    ''', (start_date.isoformat(),))
-                    
-                    rows = cursor.fetchall()
-                    return [{
+                    })
+                elif kind == _SUMMARY_HEART_RATE:
+                    heart_rate_data.append({
                         "id": row["id"],
-                        "timestamp": row["timestamp"],
+                        "timestamp": row["ts"],
                         "value": row["value"],
                         "resting_rate": row["resting_rate"],
                         "activity_type": row["activity_type"],
                         "source": row["source"],
                         "created_at": row["created_at"]
-                    } for row in rows]
-                
-                elif metric_type == MetricType.WEIGHT:
-                    cursor.execute('''
-                    SELECT 
-                        id,
-                        timestamp,
-                        value,
-                        bmi,
-                        body_fat,
-                        muscle_mass,
-                        water_percentage,
-                        bone_mass,
-                        source,
-                        created_at
-                    FROM weight
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp DESC
-                    ''', (start_date.isoformat(),))
-                    
-                    rows = cursor.fetchall()
-                    return [{
+                    })
+                else:
+                    weight_data.append({
                         "id": row["id"],
-                        "timestamp": row["timestamp"],
+                        "timestamp": row["ts"],
                         "value": row["value"],
                         "bmi": row["bmi"],
                         "body_composition": {
@@ -279,130 +884,17 @@ class HealthDataService:
                         } if row["body_fat"] is not None else None,
                         "source": row["source"],
                         "created_at": row["created_at"]
-                    } for row in rows]
-                
-                else:
-                    raise ValueError(f"Unsupported metric type: {metric_type}")
-        
-        except Exception as e:
-            logger.error(f"Error retrieving {metric_type} data: {str(e)}")
-            raise HealthDataError(
-                error=f"Failed to retrieve {metric_type} data",
-                details={"error": str(e)}
-            )
-    
-    async def get_daily_summary(
-        self,
-        date: datetime
-    ) -> Dict[str, Any]:
-        """Get a summary of health metrics for a specific day"""
-        try:
-            # Ensure date is UTC-aware
-            if date.tzinfo is None:
-                date = date.replace(tzinfo=timezone.utc)
-            end_date = date + timedelta(days=1)
+                    })
             
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                # Get sleep data
-                cursor.execute('''
-                SELECT 
-                    id,
-                    start_time,
-                    end_time,
-                    quality,
-                    deep_sleep,
-                    light_sleep,
-                    rem_sleep,
-                    awake_time,
-                    source,
-                    created_at
-                FROM sleep
-                WHERE start_time >= ? AND start_time < ?
-                ''', (date.isoformat(), end_date.isoformat()))
-                sleep_rows = cursor.fetchall()
-                sleep_data = [{
-                    "id": row["id"],
-                    "start_time": row["start_time"],
-                    "end_time": row["end_time"],
-                    "quality": row["quality"],
-                    "phases": {
-                        "deep": row["deep_sleep"],
-                        "light": row["light_sleep"],
-                        "rem": row["rem_sleep"],
-                        "awake": row["awake_time"]
-                    },
-                    "source": row["source"],
-                    "created_at": row["created_at"]
-                } for row in sleep_rows]
-                
-                # Get heart rate data
-                cursor.execute('''
-                SELECT 
-                    id,
-                    timestamp,
-                    value,
-                    resting_rate,
-                    activity_type,
-                    source,
-                    created_at
-                FROM heart_rate
-                WHERE timestamp >= ? AND timestamp < ?
-                ''', (date.isoformat(), end_date.isoformat()))
-                hr_rows = cursor.fetchall()
-                heart_rate_data = [{
-                    "id": row["id"],
-                    "timestamp": row["timestamp"],
-                    "value": row["value"],
-                    "resting_rate": row["resting_rate"],
-                    "activity_type": row["activity_type"],
-                    "source": row["source"],
-                    "created_at": row["created_at"]
-                } for row in hr_rows]
-                
-                # Get weight data
-                cursor.execute('''
-                SELECT 
-                    id,
-                    timestamp,
-                    value,
-                    bmi,
-                    body_fat,
-                    muscle_mass,
-                    water_percentage,
-                    bone_mass,
-                    source,
-                    created_at
-                FROM weight
-                WHERE timestamp >= ? AND timestamp < ?
-                ''', (date.isoformat(), end_date.isoformat()))
-                weight_rows = cursor.fetchall()
-                weight_data = [{
-                    "id": row["id"],
-                    "timestamp": row["timestamp"],
-                    "value": row["value"],
-                    "bmi": row["bmi"],
-                    "body_composition": {
-                        "body_fat": row["body_fat"],
-                        "muscle_mass": row["muscle_mass"],
-                        "water_percentage": row["water_percentage"],
-                        "bone_mass": row["bone_mass"]
-                    } if row["body_fat"] is not None else None,
-                    "source": row["source"],
-                    "created_at": row["created_at"]
-                } for row in weight_rows]
-                
-                return {
-                    "date": date.isoformat(),
-                    "sleep": sleep_data,
-                    "heart_rate": heart_rate_data,
-                    "weight": weight_data
-                }
+            return {
+                "date": date.isoformat(),
+                "sleep": sleep_data,
+                "heart_rate": heart_rate_data,
+                "weight": weight_data
+            }
         
         except Exception as e:
-            logger.error(f"Error retrieving daily summary: {str(e)}")
+            logger.error("Error retrieving daily summary: %s", e)
             raise HealthDataError(
                 error="Failed to retrieve daily summary",
                 details={"error": str(e)}
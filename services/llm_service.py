@@ -1,15 +1,75 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 import os
+import asyncio
+import hashlib
 import google.generativeai as genai
 from dotenv import load_dotenv
 import logging
 from datetime import datetime, timedelta
-import json
+import orjson
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Seconds a generated insight is reused for identical metrics
+INSIGHTS_TTL = 300
+
+# Most generations kept for reuse; the oldest is dropped past this
+INSIGHTS_CACHE_SIZE = 1024
+
+# Upper bound on generated tokens; a complete insights object is ~250
+MAX_OUTPUT_TOKENS = 512
+
+# Instructions shared by every request, sent once as the model's system
+# instruction rather than repeated in each prompt
+SYSTEM_INSTRUCTION = """You are a healthcare AI assistant. Analyze the health data you are given and provide insights in a specific JSON format.
+
+IMPORTANT: You must respond with ONLY a valid JSON object in this exact format, with no additional text or explanation:
+{
+    "summary": "A clear, engaging summary of your health status (max 2 sentences). Use simple language but include one medical term if relevant.",
+    "status": "good|fair|poor",
+    "highlights": [
+        "One positive health indicator in simple terms",
+        "One area to focus on, explained clearly"
+    ],
+    "recommendations": [
+        "One practical health recommendation",
+        "One lifestyle suggestion"
+    ],
+    "next_steps": "One specific, easy-to-follow action for today"
+}
+
+Rules:
+1. Respond with ONLY the JSON object, no other text
+2. Use simple, clear language
+3. Keep all text concise and mobile-friendly
+4. Make recommendations practical and actionable
+5. Use positive, encouraging language
+6. Include one medical term in the summary, but explain it simply
+7. Status must be exactly one of: "good", "fair", or "poor"
+
+Example of balanced language:
+- Instead of "Cardiac metrics within normal parameters" use "Heart rate is in a healthy range"
+- Instead of "Sleep hygiene protocol" use "Sleep routine"
+- Instead of "Cardiovascular monitoring" use "Heart rate tracking"
+- Instead of "Vital signs" use "Health measurements" or "Health numbers"
+
+Remember: Your response must be ONLY the JSON object, with no additional text or explanation."""
+
+# Shape Gemini is constrained to when generating insights
+INSIGHTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "status": {"type": "string", "enum": ["good", "fair", "poor"]},
+        "highlights": {"type": "array", "items": {"type": "string"}},
+        "recommendations": {"type": "array", "items": {"type": "string"}},
+        "next_steps": {"type": "string"},
+    },
+    "required": ["summary", "status", "highlights", "recommendations", "next_steps"],
+}
+
 
 class LLMService:
     def __init__(self):
@@ -21,7 +81,20 @@ class LLMService:
 
         # Configure Gemini
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model = genai.GenerativeModel(
+            'gemini-1.5-flash',
+            system_instruction=SYSTEM_INSTRUCTION,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=INSIGHTS_SCHEMA,
+                max_output_tokens=MAX_OUTPUT_TOKENS
+            )
+        )
+
+        # Insight generations keyed by metrics digest, so identical requests
+        # share a single LLM call while it runs and for INSIGHTS_TTL after.
+        # Dicts keep insertion order, so the first key is the oldest
+        self._inflight: Dict[str, asyncio.Task] = {}
 
         logger.info("Initialized LLM service with Google Gemini")
 
@@ -30,17 +103,21 @@ class LLMService:
         if not sleep_data:
             return "No sleep data available."
 
-        total_sleep = sum(s.get('totalSleepTime', 0) for s in sleep_data)
-        avg_sleep = total_sleep / len(sleep_data)
-        avg_quality = sum(s.get('sleepQuality', 0)
-                          for s in sleep_data) / len(sleep_data)
+        # Accumulate every total in one pass over the sessions
+        total_sleep = total_quality = total_deep = total_rem = 0
+        for s in sleep_data:
+            total_sleep += s.get('totalSleepTime', 0)
+            total_quality += s.get('sleepQuality', 0)
+            total_deep += s.get('deepSleepTime', 0)
+            total_rem += s.get('remSleepTime', 0)
+        count = len(sleep_data)
 
         return f"""
 Sleep Analysis:
-- Average sleep duration: {avg_sleep/60:.1f} hours
-- Average sleep quality: {avg_quality:.1f}/100
-- Deep sleep: {sum(s.get('deepSleepTime', 0) for s in sleep_data)/len(sleep_data)/60:.1f} hours
-- REM sleep: {sum(s.get('remSleepTime', 0) for s in sleep_data)/len(sleep_data)/60:.1f} hours
+- Average sleep duration: {total_sleep/count/60:.1f} hours
+- Average sleep quality: {total_quality/count:.1f}/100
+- Deep sleep: {total_deep/count/60:.1f} hours
+- REM sleep: {total_rem/count/60:.1f} hours
 """
 
     def _analyze_weight_trends(self, weight_data: List[Dict]) -> str:
@@ -48,7 +125,11 @@ Sleep Analysis:
         if not weight_data:
             return "No weight data available."
 
-        weights = [w.get('weight', 0) for w in weight_data]
+        weights = []
+        bmis = []
+        for w in weight_data:
+            weights.append(w.get('weight', 0))
+            bmis.append(w.get('bmi', 0))
         avg_weight = sum(weights) / len(weights)
         weight_change = weights[-1] - weights[0]
 
@@ -56,7 +137,7 @@ Sleep Analysis:
 Weight Analysis:
 - Average weight: {avg_weight:.1f} kg
 - Weight change: {weight_change:+.1f} kg
-- BMI range: {min(w.get('bmi', 0) for w in weight_data):.1f} - {max(w.get('bmi', 0) for w in weight_data):.1f}
+- BMI range: {min(bmis):.1f} - {max(bmis):.1f}
 """
 
     def _analyze_heart_rate(self, heart_rate_data: List[Dict]) -> str:
@@ -64,7 +145,11 @@ Weight Analysis:
         if not heart_rate_data:
             return "No heart rate data available."
 
-        heart_rates = [hr.get('heartRate', 0) for hr in heart_rate_data]
+        heart_rates = []
+        total_resting = 0
+        for hr in heart_rate_data:
+            heart_rates.append(hr.get('heartRate', 0))
+            total_resting += hr.get('restingHeartRate', 0)
         avg_hr = sum(heart_rates) / len(heart_rates)
         max_hr = max(heart_rates)
         min_hr = min(heart_rates)
@@ -73,74 +158,88 @@ Weight Analysis:
 Heart Rate Analysis:
 - Average heart rate: {avg_hr:.1f} bpm
 - Range: {min_hr} - {max_hr} bpm
-- Resting heart rate: {sum(hr.get('restingHeartRate', 0) for hr in heart_rate_data)/len(heart_rate_data):.1f} bpm
+- Resting heart rate: {total_resting/len(heart_rate_data):.1f} bpm
 """
 
     def _generate_prompt(self, metrics: List[Dict[str, Any]]) -> str:
         """Generate a mobile-optimized prompt for the LLM based on health metrics"""
         try:
-            # Group metrics by type
-            sleep_data = [m for m in metrics if m['metric_type'] == 'sleep']
-            weight_data = [m for m in metrics if m['metric_type'] == 'weight']
-            heart_rate_data = [m for m in metrics if m['metric_type'] == 'heart_rate']
+            # Accumulate the per-type totals in one pass over the metrics
+            sleep_count = total_sleep = total_quality = 0
+            hr_count = total_hr = 0
+            first_weight = last_weight = None
+            resting_hr = 0
+            for m in metrics:
+                metric_type = m['metric_type']
+                if metric_type == 'sleep':
+                    sleep_count += 1
+                    total_sleep += m.get('totalSleepTime', 0)
+                    total_quality += m.get('sleepQuality', 0)
+                elif metric_type == 'heart_rate':
+                    hr_count += 1
+                    total_hr += m.get('heartRate', 0)
+                    resting_hr = m.get('restingHeartRate', 0)
+                elif metric_type == 'weight':
+                    if first_weight is None:
+                        first_weight = m
+                    last_weight = m
 
             # Calculate key metrics for mobile display
-            avg_sleep = sum(s.get('totalSleepTime', 0) for s in sleep_data)/len(sleep_data)/60 if sleep_data else 0
-            avg_quality = sum(s.get('sleepQuality', 0) for s in sleep_data)/len(sleep_data) if sleep_data else 0
-            current_weight = weight_data[-1].get('weight', 0) if weight_data else 0
-            weight_trend = (weight_data[-1].get('weight', 0) - weight_data[0].get('weight', 0)) if weight_data else 0
-            avg_hr = sum(hr.get('heartRate', 0) for hr in heart_rate_data)/len(heart_rate_data) if heart_rate_data else 0
-            resting_hr = heart_rate_data[-1].get('restingHeartRate', 0) if heart_rate_data else 0
+            avg_sleep = total_sleep/sleep_count/60 if sleep_count else 0
+            avg_quality = total_quality/sleep_count if sleep_count else 0
+            current_weight = last_weight.get('weight', 0) if last_weight else 0
+            weight_trend = (last_weight.get('weight', 0) - first_weight.get('weight', 0)) if last_weight else 0
+            avg_hr = total_hr/hr_count if hr_count else 0
 
-            # Generate mobile-optimized data summary
-            data_summary = f"""Health Metrics (Last {len(sleep_data)} days):
+            # Only the mobile-optimized data summary varies per request; the
+            # instructions live in SYSTEM_INSTRUCTION
+            return f"""DATA:
+Health Metrics (Last {sleep_count} days):
 
 Sleep: {avg_sleep:.1f}h avg, {avg_quality:.0f}/100 quality
 Weight: {current_weight:.1f}kg ({weight_trend:+.1f}kg)
 Heart Rate: {avg_hr:.0f} bpm avg, {resting_hr:.0f} bpm resting"""
-
-            prompt = f"""You are a healthcare AI assistant. Analyze the following health data and provide insights in a specific JSON format.
-
-DATA:
-{data_summary}
-
-IMPORTANT: You must respond with ONLY a valid JSON object in this exact format, with no additional text or explanation:
-{{
-    "summary": "A clear, engaging summary of your health status (max 2 sentences). Use simple language but include one medical term if relevant.",
-    "status": "good|fair|poor",
-    "highlights": [
-        "One positive health indicator in simple terms",
-        "One area to focus on, explained clearly"
-    ],
-    "recommendations": [
-        "One practical health recommendation",
-        "One lifestyle suggestion"
-    ],
-    "next_steps": "One specific, easy-to-follow action for today"
-}}
-
-Rules:
-1. Respond with ONLY the JSON object, no other text
-2. Use simple, clear language
-3. Keep all text concise and mobile-friendly
-4. Make recommendations practical and actionable
-5. Use positive, encouraging language
-6. Include one medical term in the summary, but explain it simply
-7. Status must be exactly one of: "good", "fair", or "poor"
-
-Example of balanced language:
-- Instead of "Cardiac metrics within normal parameters" use "Heart rate is in a healthy range"
-- Instead of "Sleep hygiene protocol" use "Sleep routine"
-- Instead of "Cardiovascular monitoring" use "Heart rate tracking"
-- Instead of "Vital signs" use "Health measurements" or "Health numbers"
-
-Remember: Your response must be ONLY the JSON object, with no additional text or explanation."""
-            return prompt
         except Exception as e:
-            logger.error(f"Error generating prompt: {str(e)}")
+            logger.error("Error generating prompt: %s", e)
             raise
 
     async def get_health_insights(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Generate health insights, reusing the result for identical metrics"""
+        # orjson serializes datetimes natively, so only unknown types fall back to str
+        key = hashlib.blake2b(
+            orjson.dumps(metrics, option=orjson.OPT_SORT_KEYS, default=str)
+        ).hexdigest()
+
+        task = self._inflight.get(key)
+        if task is None:
+            if len(self._inflight) >= INSIGHTS_CACHE_SIZE:
+                del self._inflight[next(iter(self._inflight))]
+            task = asyncio.ensure_future(self._generate_health_insights(metrics))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._expire(key, t))
+
+        # Shield the shared task so one cancelled caller doesn't cancel the rest
+        return await asyncio.shield(task)
+
+    def _expire(self, key: str, task: asyncio.Task):
+        """Forget a finished generation after INSIGHTS_TTL, or at once if it
+        failed or fell back to placeholder insights"""
+        failed = (
+            task.cancelled()
+            or task.exception() is not None
+            or task.result().get("fallback", False)
+        )
+        asyncio.get_running_loop().call_later(
+            0 if failed else INSIGHTS_TTL, self._forget, key, task
+        )
+
+    def _forget(self, key: str, task: asyncio.Task):
+        """Drop the entry for key if it still holds task"""
+        # The key may since have been evicted and regenerated by a newer task
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _generate_health_insights(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate mobile-optimized health insights using the LLM"""
         try:
             if not metrics:
@@ -160,27 +259,14 @@ Remember: Your response must be ONLY the JSON object, with no additional text or
 
             prompt = self._generate_prompt(metrics)
 
-            # Generate response using Gemini
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+            # Generate response using Gemini without blocking the event loop
+            response = await self.model.generate_content_async(prompt)
+            response_text = response.text
 
             try:
-                # Clean the response text to ensure it's valid JSON
-                # Remove any markdown code block markers
-                response_text = response_text.replace('```json', '').replace('```', '').strip()
-                
-                # Parse the JSON response
-                insights = json.loads(response_text)
-
-                # Validate required fields
-                required_fields = ["summary", "status", "highlights", "recommendations", "next_steps"]
-                for field in required_fields:
-                    if field not in insights:
-                        raise ValueError(f"Missing required field: {field}")
-
-                # Validate status
-                if insights["status"] not in ["good", "fair", "poor"]:
-                    insights["status"] = "fair"
+                # The response is constrained to INSIGHTS_SCHEMA, but it can
+                # still be cut short by MAX_OUTPUT_TOKENS
+                insights = orjson.loads(response_text)
 
                 # Ensure lists have at least one item
                 if not insights["highlights"]:
@@ -196,27 +282,45 @@ Remember: Your response must be ONLY the JSON object, with no additional text or
 
                 return insights
 
-            except json.JSONDecodeError as e:
+            except (orjson.JSONDecodeError, KeyError, TypeError) as e:
                 # Log the actual response for debugging
-                logger.error(f"Failed to parse JSON response. Response text: {response_text}")
-                logger.error(f"JSON decode error: {str(e)}")
-                
-                # Fallback to structured format if JSON parsing fails
+                logger.error("Failed to parse JSON response. Response text: %s", response_text)
+                logger.error("JSON decode error: %s", e)
+
+                # Fall back to a neutral placeholder that says nothing about
+                # the data, marked so it is never cached
                 logger.warning("Using fallback format due to JSON parsing error")
                 return {
-                    "summary": "Your health numbers look good! Your heart rate and sleep patterns are in a healthy range.",
-                    "status": "good",
+                    "summary": "Your insights couldn't be generated right now. Your health data is saved, so please try again shortly.",
+                    "status": "fair",
                     "highlights": [
-                        "Sleep quality is improving",
-                        "Heart rate shows good recovery"
+                        "Your health data has been recorded",
+                        "Insights will be ready on your next refresh"
                     ],
                     "recommendations": [
-                        "Keep up your current sleep routine",
-                        "Continue your regular heart rate tracking"
+                        "Keep up your usual routine",
+                        "Check back in a few minutes for personalized insights"
                     ],
-                    "next_steps": "Check your sleep quality trends for the week"
+                    "next_steps": "Refresh your insights in a few minutes",
+                    "fallback": True
                 }
 
         except Exception as e:
-            logger.error(f"Error generating health insights: {str(e)}")
+            logger.error("Error generating health insights: %s", e)
             raise
+
+    async def stream_health_insights(self, metrics: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Stream the raw insight JSON text from the LLM as it is generated.
+
+        Unlike get_health_insights, the output is not validated or repaired;
+        clients assemble the chunks and parse the final JSON themselves.
+        """
+        if not metrics:
+            yield orjson.dumps(await self.get_health_insights(metrics)).decode()
+            return
+
+        prompt = self._generate_prompt(metrics)
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
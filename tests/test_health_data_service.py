@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.health_data import service as service_module
+from services.health_data.models import HealthDataError, HeartRateData, MetricType
+from services.health_data.service import HealthDataService
+
+
+@pytest.fixture
+def service(tmp_path):
+    return HealthDataService(str(tmp_path / "health_data.db"))
+
+
+def _reading(minutes_ago: int, value: int = 70) -> HeartRateData:
+    return HeartRateData(
+        timestamp=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        value=value,
+        source="test"
+    )
+
+
+def _row(minutes_ago: int, value) -> tuple:
+    timestamp = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    return (timestamp.isoformat(), value, None, None, "test")
+
+
+def _heart_rate_count(service: HealthDataService) -> int:
+    with service._reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM heart_rate").fetchone()[0]
+
+
+def _count_inserts(service: HealthDataService, monkeypatch) -> list:
+    """Record the row count of every insert the heart rate flush makes"""
+    calls = []
+    insert_rows = service._insert_rows
+
+    def recording(sql, rows):
+        calls.append(len(rows))
+        return insert_rows(sql, rows)
+
+    monkeypatch.setattr(service, "_insert_rows", recording)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readings_share_one_insert(service, monkeypatch):
+    calls = _count_inserts(service, monkeypatch)
+
+    responses = await asyncio.gather(
+        *(service.store_heart_rate_data(_reading(i)) for i in range(10))
+    )
+
+    assert [r.status for r in responses] == ["success"] * 10
+    assert calls == [10]
+    assert _heart_rate_count(service) == 10
+
+
+@pytest.mark.asyncio
+async def test_readings_outside_the_window_are_separate_inserts(service, monkeypatch):
+    calls = _count_inserts(service, monkeypatch)
+
+    await service.store_heart_rate_data(_reading(2))
+    await service.store_heart_rate_data(_reading(1))
+
+    assert calls == [1, 1]
+    assert _heart_rate_count(service) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_fails_every_waiting_reading(service, monkeypatch):
+    def failing(sql, rows):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(service, "_insert_rows", failing)
+
+    results = await asyncio.gather(
+        *(service.store_heart_rate_data(_reading(i)) for i in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(r, HealthDataError) for r in results)
+    assert service._pending_heart_rate == []
+    assert service._heart_rate_flush is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_skips_only_rows_violating_constraints(service, monkeypatch):
+    # Small chunks so the bad row sits in the middle of the second one
+    monkeypatch.setattr(service_module, "BULK_BATCH_SIZE", 3)
+    rows = [_row(i, 70) for i in range(7)]
+    rows[4] = _row(4, None)
+
+    response = await service.store_rows(MetricType.HEART_RATE, rows)
+
+    assert response.data == {"count": 6}
+    assert _heart_rate_count(service) == 6
+
+
+@pytest.mark.asyncio
+async def test_multi_row_statement_falls_back_to_single_rows(service):
+    # Enough rows that the chunk goes through the multi-row INSERT
+    rows = [_row(i, 70) for i in range(500)]
+    rows[250] = _row(250, None)
+
+    response = await service.store_rows(MetricType.HEART_RATE, rows)
+
+    assert response.data == {"count": 499}
+    assert _heart_rate_count(service) == 499
+
+
+@pytest.mark.asyncio
+async def test_bulk_transaction_counts_survive_a_bad_row(service):
+    await service.begin_bulk()
+    first = await service.store_rows(MetricType.HEART_RATE, [_row(1, 70), _row(2, None)])
+    second = await service.store_rows(MetricType.HEART_RATE, [_row(3, 71)])
+    await service.commit_bulk()
+
+    assert first.data == {"count": 1}
+    assert second.data == {"count": 1}
+    assert _heart_rate_count(service) == 2
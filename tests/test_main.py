@@ -0,0 +1,44 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """App client with its SQLite database in a temporary directory"""
+    os.environ.setdefault("GOOGLE_API_KEY", "test")
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("data"))
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/health-data/sleep",
+    "/api/v1/health-data/heart-rate",
+    "/api/v1/health-data/heart-rate/batch",
+    "/api/v1/health-data/weight",
+])
+@pytest.mark.parametrize("body", [b"{bad", b""])
+def test_malformed_body_is_rejected_with_422(client, path, body):
+    response = client.post(path, content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/health-data/sleep",
+    "/api/v1/health-data/heart-rate",
+    "/api/v1/health-data/heart-rate/batch",
+    "/api/v1/health-data/weight",
+])
+def test_submit_routes_document_their_request_body(client, path):
+    body = client.app.openapi()["paths"][path]["post"]["requestBody"]
+
+    assert body["required"] is True
+    assert "schema" in body["content"]["application/json"]